@@ -41,18 +41,21 @@ class _ParsedCsvToTfExample(beam.DoFn):
     self._column_handlers = None
 
   def _process_column_infos(self, column_infos: List[csv_decoder.ColumnInfo]):
+    # Handlers fill in the feature of the output tf.Example in place, which
+    # avoids building a standalone Feature per cell and copying it into the
+    # Example's feature map.
     column_handlers = []
     for column_info in column_infos:
       # pylint: disable=g-long-lambda
       if column_info.type == csv_decoder.ColumnType.INT:
-        handler_fn = lambda csv_cell: tf.train.Feature(
-            int64_list=tf.train.Int64List(value=[int(csv_cell)]))
+        handler_fn = lambda feature, csv_cell: feature.int64_list.value.append(
+            int(csv_cell))
       elif column_info.type == csv_decoder.ColumnType.FLOAT:
-        handler_fn = lambda csv_cell: tf.train.Feature(
-            float_list=tf.train.FloatList(value=[float(csv_cell)]))
+        handler_fn = lambda feature, csv_cell: feature.float_list.value.append(
+            float(csv_cell))
       elif column_info.type == csv_decoder.ColumnType.STRING:
-        handler_fn = lambda csv_cell: tf.train.Feature(
-            bytes_list=tf.train.BytesList(value=[csv_cell]))
+        handler_fn = lambda feature, csv_cell: feature.bytes_list.value.append(
+            csv_cell)
       else:
         handler_fn = None
       column_handlers.append((column_info.name, handler_fn))
@@ -72,18 +75,22 @@ class _ParsedCsvToTfExample(beam.DoFn):
     if len(csv_cells) != len(self._column_handlers):
       raise ValueError('Invalid CSV line: {}'.format(csv_cells))
 
-    feature = {}
+    example = tf.train.Example()
+    feature = example.features.feature
     for csv_cell, (column_name, handler_fn) in zip(csv_cells,
                                                    self._column_handlers):
+      # Clear the feature first so that, as when a new Feature was assigned per
+      # cell, the last of several columns sharing a name wins.
+      column_feature = feature[column_name]
+      column_feature.Clear()
       if not csv_cell:
-        feature[column_name] = tf.train.Feature()
         continue
       if not handler_fn:
         raise ValueError(
             'Internal error: failed to infer type of column {} while it'
             'had at least some values {}'.format(column_name, csv_cell))
-      feature[column_name] = handler_fn(csv_cell)
-    yield tf.train.Example(features=tf.train.Features(feature=feature))
+      handler_fn(column_feature, csv_cell)
+    yield example
 
 
 @beam.ptransform_fn
@@ -21,6 +21,7 @@ import os
 import apache_beam as beam
 from apache_beam.testing import util
 import tensorflow as tf
+from tfx_bsl.coders import csv_decoder
 from tfx.components.example_gen.csv_example_gen import executor
 from tfx.proto import example_gen_pb2
 from tfx.types import standard_artifacts
@@ -38,6 +39,73 @@ class ExecutorTest(tf.test.TestCase):
     input_base.uri = os.path.join(input_data_dir, 'external')
     self._input_dict = {'input_base': [input_base]}
 
+  def testParsedCsvToTfExample(self):
+    column_infos = [
+        csv_decoder.ColumnInfo('int_feature', csv_decoder.ColumnType.INT),
+        csv_decoder.ColumnInfo('float_feature', csv_decoder.ColumnType.FLOAT),
+        csv_decoder.ColumnInfo('str_feature', csv_decoder.ColumnType.STRING),
+        csv_decoder.ColumnInfo('empty_feature', csv_decoder.ColumnType.INT),
+    ]
+    dofn = executor._ParsedCsvToTfExample()
+    examples = list(dofn.process([b'15', b'2.5', b'abc', b''], column_infos))
+    examples += list(dofn.process([b'', b'', b'', b'7'], column_infos))
+
+    expected_examples = [
+        tf.train.Example(
+            features=tf.train.Features(
+                feature={
+                    'int_feature':
+                        tf.train.Feature(
+                            int64_list=tf.train.Int64List(value=[15])),
+                    'float_feature':
+                        tf.train.Feature(
+                            float_list=tf.train.FloatList(value=[2.5])),
+                    'str_feature':
+                        tf.train.Feature(
+                            bytes_list=tf.train.BytesList(value=[b'abc'])),
+                    'empty_feature':
+                        tf.train.Feature(),
+                })),
+        tf.train.Example(
+            features=tf.train.Features(
+                feature={
+                    'int_feature':
+                        tf.train.Feature(),
+                    'float_feature':
+                        tf.train.Feature(),
+                    'str_feature':
+                        tf.train.Feature(),
+                    'empty_feature':
+                        tf.train.Feature(
+                            int64_list=tf.train.Int64List(value=[7])),
+                })),
+    ]
+    self.assertEqual(expected_examples, examples)
+
+  def testParsedCsvToTfExampleDuplicateColumnName(self):
+    column_infos = [
+        csv_decoder.ColumnInfo('feature', csv_decoder.ColumnType.INT),
+        csv_decoder.ColumnInfo('feature', csv_decoder.ColumnType.INT),
+    ]
+    dofn = executor._ParsedCsvToTfExample()
+
+    # The last column with a given name wins.
+    self.assertEqual([
+        tf.train.Example(
+            features=tf.train.Features(
+                feature={
+                    'feature':
+                        tf.train.Feature(
+                            int64_list=tf.train.Int64List(value=[2])),
+                }))
+    ], list(dofn.process([b'1', b'2'], column_infos)))
+    self.assertEqual([
+        tf.train.Example(
+            features=tf.train.Features(feature={
+                'feature': tf.train.Feature(),
+            }))
+    ], list(dofn.process([b'1', b''], column_infos)))
+
   def testCsvToExample(self):
     with beam.Pipeline() as pipeline:
       examples = (
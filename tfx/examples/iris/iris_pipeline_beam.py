@@ -20,6 +20,7 @@ from __future__ import print_function
 import os
 import absl
 from typing import Text
+from ml_metadata.proto import metadata_store_pb2
 from tfx.components import CsvExampleGen
 from tfx.components import Evaluator
 from tfx.components import ExampleValidator
@@ -37,9 +38,11 @@ from tfx.utils.dsl_utils import external_input
 
 _pipeline_name = 'iris'
 
+_home = os.environ['HOME']
+
 # This example assumes that Iris flowers data is stored in ~/iris/data and the
 # utility function is in ~/iris. Feel free to customize as needed.
-_iris_root = os.path.join(os.environ['HOME'], 'iris')
+_iris_root = os.path.join(_home, 'iris')
 _data_root = os.path.join(_iris_root, 'data')
 # Python module file to inject customized logic into the TFX components. The
 # Transform and Trainer both require user-defined functions to run successfully.
@@ -51,16 +54,24 @@ _serving_model_dir = os.path.join(_iris_root, 'serving_model', _pipeline_name)
 # Directory and data locations.  This example assumes all of the flowers
 # example code and metadata library is relative to $HOME, but you can store
 # these files anywhere on your local filesystem.
-_tfx_root = os.path.join(os.environ['HOME'], 'tfx')
+_tfx_root = os.path.join(_home, 'tfx')
 _pipeline_root = os.path.join(_tfx_root, 'pipelines', _pipeline_name)
 # Sqlite ML-metadata db path.
 _metadata_path = os.path.join(_tfx_root, 'metadata', _pipeline_name,
                               'metadata.db')
-
-
-def _create_pipeline(pipeline_name: Text, pipeline_root: Text, data_root: Text,
-                     module_file: Text, serving_model_dir: Text,
-                     metadata_path: Text) -> pipeline.Pipeline:
+# Sqlite is fine for local development. Once the metadata store holds many
+# executions, prefer a MySQL backend (e.g. Cloud SQL), which serves cache
+# lookups from indexed tables:
+#   metadata.mysql_metadata_connection_config(
+#       host='...', port=3306, database='...', username='...', password='...')
+# See https://www.tensorflow.org/tfx/guide/mlmd#metadata_storage_backends_and_store_connection_configuration.
+
+
+def _create_pipeline(
+    pipeline_name: Text, pipeline_root: Text, data_root: Text,
+    module_file: Text, serving_model_dir: Text,
+    metadata_connection_config: metadata_store_pb2.ConnectionConfig,
+    direct_num_workers: int) -> pipeline.Pipeline:
   """Implements the Iris flowers pipeline with TFX."""
   examples = external_input(data_root)
 
@@ -113,15 +124,18 @@ def _create_pipeline(pipeline_name: Text, pipeline_root: Text, data_root: Text,
           model_analyzer, model_validator, pusher
       ],
       enable_cache=True,
-      metadata_connection_config=metadata.sqlite_metadata_connection_config(
-          metadata_path),
+      metadata_connection_config=metadata_connection_config,
+      # TODO(b/141578059): The multi-processing API might change.
+      beam_pipeline_args=['--direct_num_workers=%d' % direct_num_workers],
   )
 
 
 # To run this pipeline from the python CLI:
 #   $python iris_pipeline.py
 if __name__ == '__main__':
-  absl.logging.set_verbosity(absl.logging.INFO)
+  # Components log per-bundle progress at INFO level; set TFX_LOG_LEVEL=INFO
+  # to see it.
+  absl.logging.set_verbosity(os.environ.get('TFX_LOG_LEVEL', 'WARNING'))
   BeamDagRunner().run(
       _create_pipeline(
           pipeline_name=_pipeline_name,
@@ -129,4 +143,8 @@ if __name__ == '__main__':
           data_root=_data_root,
           module_file=_module_file,
           serving_model_dir=_serving_model_dir,
-          metadata_path=_metadata_path))
+          metadata_connection_config=metadata.sqlite_metadata_connection_config(
+              _metadata_path, enable_wal=True),
+          # 0 means auto-detect based on the number of CPUs available during
+          # execution time.
+          direct_num_workers=0))
@@ -62,6 +62,8 @@ class IrisPipelineBeamEndToEndTest(tf.test.TestCase):
     self.assertExecutedOnce('Trainer')
 
   def testIrisPipelineBeam(self):
+    metadata_config = metadata.sqlite_metadata_connection_config(
+        self._metadata_path)
     BeamDagRunner().run(
         iris_pipeline_beam._create_pipeline(
             pipeline_name=self._pipeline_name,
@@ -69,12 +71,11 @@ class IrisPipelineBeamEndToEndTest(tf.test.TestCase):
             module_file=self._module_file,
             serving_model_dir=self._serving_model_dir,
             pipeline_root=self._pipeline_root,
-            metadata_path=self._metadata_path))
+            metadata_connection_config=metadata_config,
+            direct_num_workers=1))
 
     self.assertTrue(tf.io.gfile.exists(self._serving_model_dir))
     self.assertTrue(tf.io.gfile.exists(self._metadata_path))
-    metadata_config = metadata.sqlite_metadata_connection_config(
-        self._metadata_path)
     with metadata.Metadata(metadata_config) as m:
       artifact_count = len(m.store.get_artifacts())
       execution_count = len(m.store.get_executions())
@@ -91,7 +92,8 @@ class IrisPipelineBeamEndToEndTest(tf.test.TestCase):
             module_file=self._module_file,
             serving_model_dir=self._serving_model_dir,
             pipeline_root=self._pipeline_root,
-            metadata_path=self._metadata_path))
+            metadata_connection_config=metadata_config,
+            direct_num_workers=1))
 
     # Assert cache execution.
     with metadata.Metadata(metadata_config) as m:
@@ -18,9 +18,10 @@ from __future__ import division
 from __future__ import print_function
 
 import collections
-import copy
 import hashlib
 import os
+import re
+import sqlite3
 import types
 import absl
 import tensorflow as tf
@@ -34,6 +35,9 @@ from tfx.types.artifact import ArtifactState
 
 # Maximum number of executions we look at for previous result.
 MAX_EXECUTIONS_FOR_CACHE = 100
+# Number of candidate executions whose events are fetched in a single call
+# while looking for a cached execution.
+_CACHE_LOOKUP_PAGE_SIZE = 20
 # Execution state constant. We should replace this with MLMD enum once that is
 # ready.
 EXECUTION_STATE_CACHED = 'cached'
@@ -52,19 +56,80 @@ _EXECUTION_TYPE_RESERVED_KEYS = {
     _EXECUTION_TYPE_KEY_PIPELINE_ROOT, _EXECUTION_TYPE_KEY_RUN_ID,
     _EXECUTION_TYPE_KEY_COMPONENT_ID
 }
+# Mount table used to find the filesystem type of a sqlite metadata db.
+_PROC_MOUNTS = '/proc/mounts'
+# Filesystem types on which sqlite does not support write-ahead logging, since
+# the WAL index relies on shared memory between all processes using the db.
+_NETWORK_FILESYSTEM_TYPES = frozenset([
+    '9p', 'afs', 'ceph', 'cifs', 'fuse.glusterfs', 'fuse.sshfs', 'glusterfs',
+    'lustre', 'ncpfs', 'nfs', 'nfs4', 'smb3', 'smbfs'
+])
+
+
+def _is_on_network_filesystem(path: Text) -> bool:
+  """Returns whether path is on a network filesystem.
+
+  The filesystem type is looked up in the mount table, which is only available
+  on Linux; paths are assumed to be local elsewhere.
+
+  Args:
+    path: local path to check.
+
+  Returns:
+    True if the mount containing path has a network filesystem type.
+  """
+  try:
+    with open(_PROC_MOUNTS) as f:
+      mounts = f.readlines()
+  except (IOError, OSError):
+    return False
+  path = os.path.realpath(path)
+  mount_point, fs_type = '', None
+  for line in mounts:
+    fields = line.split()
+    if len(fields) < 3:
+      continue
+    # Whitespace in mount points is escaped as octal, e.g. '\040' for space.
+    candidate = re.sub(r'\\([0-7]{3})', lambda m: chr(int(m.group(1), 8)),
+                       fields[1])
+    if path != candidate and not path.startswith(
+        candidate.rstrip('/') + '/'):
+      continue
+    # Later entries for the same mount point shadow earlier ones.
+    if len(candidate) >= len(mount_point):
+      mount_point, fs_type = candidate, fields[2]
+  return fs_type in _NETWORK_FILESYSTEM_TYPES
 
 
 def sqlite_metadata_connection_config(
-    metadata_db_uri: Text) -> metadata_store_pb2.ConnectionConfig:
+    metadata_db_uri: Text,
+    enable_wal: bool = False) -> metadata_store_pb2.ConnectionConfig:
   """Convenience function to create file based metadata connection config.
 
   Args:
     metadata_db_uri: uri to metadata db.
+    enable_wal: whether to switch the db to write-ahead logging. This makes
+      each metadata write a single append to the log instead of a rollback
+      journal write plus db write. The journal mode is stored in the db file,
+      so it also applies to the connections opened by ML Metadata. Ignored
+      for dbs on a network filesystem such as NFS, where sqlite does not
+      support WAL.
 
   Returns:
     A metadata_store_pb2.ConnectionConfig based on given metadata db uri.
   """
   tf.io.gfile.makedirs(os.path.dirname(metadata_db_uri))
+  if enable_wal and _is_on_network_filesystem(
+      os.path.dirname(metadata_db_uri)):
+    absl.logging.warning(
+        'Not enabling write-ahead logging for %s on a network filesystem.',
+        metadata_db_uri)
+  elif enable_wal:
+    connection = sqlite3.connect(metadata_db_uri)
+    try:
+      connection.execute('PRAGMA journal_mode=WAL')
+    finally:
+      connection.close()
   connection_config = metadata_store_pb2.ConnectionConfig()
   connection_config.sqlite.filename_uri = metadata_db_uri
   connection_config.sqlite.connection_mode = \
@@ -164,17 +229,34 @@ class Metadata(object):
   def publish_artifacts(
       self,
       raw_artifact_list: List[Artifact]) -> List[metadata_store_pb2.Artifact]:
-    """Publish a list of artifacts if any is not already published."""
-    artifact_list = []
+    """Publish a list of artifacts if any is not already published.
+
+    Artifacts which are not published yet are written to the metadata store
+    with a single call. An artifact listed more than once is written once.
+
+    Args:
+      raw_artifact_list: artifacts to publish.
+
+    Returns:
+      The underlying metadata artifacts, with ids set.
+    """
+    unpublished_artifacts = []
+    # Ids of the Artifact objects already in unpublished_artifacts.
+    unpublished_object_ids = set()
     for raw_artifact in raw_artifact_list:
       artifact_type = self._prepare_artifact_type(raw_artifact.artifact_type)
       raw_artifact.set_artifact_type(artifact_type)
-      if not raw_artifact.artifact.id:
+      if (not raw_artifact.artifact.id and
+          id(raw_artifact) not in unpublished_object_ids):
         raw_artifact.state = ArtifactState.PUBLISHED
-        [artifact_id] = self._store.put_artifacts([raw_artifact.artifact])
+        unpublished_artifacts.append(raw_artifact)
+        unpublished_object_ids.add(id(raw_artifact))
+    if unpublished_artifacts:
+      artifact_ids = self._store.put_artifacts(
+          [raw_artifact.artifact for raw_artifact in unpublished_artifacts])
+      for raw_artifact, artifact_id in zip(unpublished_artifacts, artifact_ids):
         raw_artifact.id = artifact_id
-      artifact_list.append(raw_artifact.artifact)
-    return artifact_list
+    return [raw_artifact.artifact for raw_artifact in raw_artifact_list]
 
   def get_all_artifacts(self) -> List[metadata_store_pb2.Artifact]:
     try:
@@ -391,16 +473,20 @@ class Metadata(object):
                   index=index,
                   event_type=metadata_store_pb2.Event.INPUT))
     if output_dict:
-      for key, output_list in output_dict.items():
-        for index, single_output in enumerate(output_list):
+      unpublished_outputs = []
+      for output_list in output_dict.values():
+        for single_output in output_list:
           if not single_output.artifact.id:
             if state == EXECUTION_STATE_CACHED:
               raise RuntimeError(
                   'output artifact id not available for cached output: %s' %
                   single_output)
-            [published_artifact] = self.publish_artifacts([single_output])  # pylint: disable=unbalanced-tuple-unpacking
-            single_output.set_artifact(published_artifact)
+            unpublished_outputs.append(single_output)
+      # Publishes all new outputs of the execution at once.
+      self.publish_artifacts(unpublished_outputs)
 
+      for key, output_list in output_dict.items():
+        for index, single_output in enumerate(output_list):
           events.append(
               self._prepare_event(
                   execution_id=execution_id,
@@ -423,6 +509,9 @@ class Metadata(object):
       candidate_execution_ids: List[int]) -> Optional[int]:
     """Gets common execution ids that are related to all the artifacts in input.
 
+    Candidates are checked in the given order. Their events are fetched one
+    page at a time, so the lookup stops at the first page containing a match.
+
     Args:
       input_dict: input used by a component run.
       candidate_execution_ids: a list of id of candidate execution.
@@ -436,22 +525,25 @@ class Metadata(object):
       for single_input in input_list:
         input_ids.add(single_input.artifact.id)
 
-    for execution_id in candidate_execution_ids:
-      events = self._store.get_events_by_execution_ids([execution_id])
-      execution_input_ids = set([
-          event.artifact_id for event in events if event.type in [
-              metadata_store_pb2.Event.INPUT,
-              metadata_store_pb2.Event.DECLARED_INPUT
-          ]
-      ])
-      if input_ids == execution_input_ids:
-        absl.logging.debug(
-            'Found matching execution with all input artifacts: %s' %
-            execution_id)
-        return execution_id
-      else:
-        absl.logging.debug(
-            'Execution %d does not match desired input artifacts', execution_id)
+    for page_start in range(0, len(candidate_execution_ids),
+                            _CACHE_LOOKUP_PAGE_SIZE):
+      page = candidate_execution_ids[page_start:page_start +
+                                     _CACHE_LOOKUP_PAGE_SIZE]
+      execution_input_ids = collections.defaultdict(set)
+      for event in self._store.get_events_by_execution_ids(page):
+        if event.type in (metadata_store_pb2.Event.INPUT,
+                          metadata_store_pb2.Event.DECLARED_INPUT):
+          execution_input_ids[event.execution_id].add(event.artifact_id)
+      for execution_id in page:
+        if input_ids == execution_input_ids[execution_id]:
+          absl.logging.debug(
+              'Found matching execution with all input artifacts: %s' %
+              execution_id)
+          return execution_id
+        else:
+          absl.logging.debug(
+              'Execution %d does not match desired input artifacts',
+              execution_id)
     absl.logging.debug(
         'No execution matching type id and input artifacts found')
     return None
@@ -494,10 +586,13 @@ class Metadata(object):
         exec_properties,
         pipeline_info=pipeline_info,
         component_info=component_info)
+    # Executions fetched from the store are not reused elsewhere, and
+    # _is_eligible_previous_execution only overwrites fields it ignores in the
+    # comparison, so no defensive copies are needed here.
     for execution in self._store.get_executions_by_type(
         component_info.component_type):
-      if self._is_eligible_previous_execution(
-          copy.deepcopy(expected_previous_execution), copy.deepcopy(execution)):
+      if self._is_eligible_previous_execution(expected_previous_execution,
+                                              execution):
         candidate_execution_ids.append(execution.id)
     candidate_execution_ids.sort(reverse=True)
     candidate_execution_ids = candidate_execution_ids[
@@ -17,6 +17,9 @@ from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
 
+import os
+import sqlite3
+
 # Standard Imports
 import mock
 import tensorflow as tf
@@ -47,6 +50,56 @@ class MetadataTest(tf.test.TestCase):
     self._pipeline_info4 = data_types.PipelineInfo(
         pipeline_name='my_pipeline2', pipeline_root='/tmp', run_id='my_run_id2')
 
+  def testSqliteMetadataConnectionConfig(self):
+    metadata_db_uri = os.path.join(self.get_temp_dir(), 'metadata', 'wal.db')
+    connection_config = metadata.sqlite_metadata_connection_config(
+        metadata_db_uri, enable_wal=True)
+    self.assertEqual(metadata_db_uri, connection_config.sqlite.filename_uri)
+    connection = sqlite3.connect(metadata_db_uri)
+    try:
+      [journal_mode] = connection.execute('PRAGMA journal_mode').fetchone()
+    finally:
+      connection.close()
+    self.assertEqual('wal', journal_mode)
+
+    with metadata.Metadata(connection_config=connection_config) as m:
+      m.publish_artifacts([])
+      eid = m.register_execution(
+          exec_properties={},
+          pipeline_info=self._pipeline_info,
+          component_info=self._component_info)
+      self.assertLen(m.store.get_executions_by_id([eid]), 1)
+
+  def testSqliteMetadataConnectionConfigSkipsWalOnNetworkFilesystem(self):
+    metadata_db_uri = os.path.join(self.get_temp_dir(), 'nfs', 'metadata.db')
+    with mock.patch.object(
+        metadata, '_is_on_network_filesystem', return_value=True):
+      metadata.sqlite_metadata_connection_config(
+          metadata_db_uri, enable_wal=True)
+    connection = sqlite3.connect(metadata_db_uri)
+    try:
+      [journal_mode] = connection.execute('PRAGMA journal_mode').fetchone()
+    finally:
+      connection.close()
+    self.assertNotEqual('wal', journal_mode)
+
+  def testIsOnNetworkFilesystem(self):
+    proc_mounts = os.path.join(self.get_temp_dir(), 'mounts')
+    with open(proc_mounts, 'w') as f:
+      f.write('/dev/sda1 / ext4 rw 0 0\n'
+              'server:/home /tfx_test_home nfs4 rw 0 0\n'
+              '/dev/sdb1 /tfx_test_home/local\\040disk ext4 rw 0 0\n')
+    with mock.patch.object(metadata, '_PROC_MOUNTS', proc_mounts):
+      self.assertTrue(metadata._is_on_network_filesystem('/tfx_test_home/user'))
+      self.assertFalse(
+          metadata._is_on_network_filesystem('/tfx_test_home/local disk/tfx'))
+      self.assertFalse(
+          metadata._is_on_network_filesystem('/tfx_test_homes/user'))
+    with mock.patch.object(metadata, '_PROC_MOUNTS',
+                           os.path.join(self.get_temp_dir(), 'missing')):
+      self.assertFalse(
+          metadata._is_on_network_filesystem('/tfx_test_home/user'))
+
   def testEmptyArtifact(self):
     with metadata.Metadata(connection_config=self._connection_config) as m:
       m.publish_artifacts([])
@@ -135,6 +188,34 @@ class MetadataTest(tf.test.TestCase):
       self.assertRaises(RuntimeError, m.check_artifact_state, artifact,
                         ArtifactState.PUBLISHED)
 
+  def testPublishArtifacts(self):
+    with metadata.Metadata(connection_config=self._connection_config) as m:
+      published_artifact = standard_artifacts.Examples()
+      published_artifact.uri = 'uri1'
+      m.publish_artifacts([published_artifact])
+
+      artifact_two = standard_artifacts.Examples()
+      artifact_two.uri = 'uri2'
+      artifact_three = standard_artifacts.Examples()
+      artifact_three.uri = 'uri3'
+      with mock.patch.object(
+          m.store, 'put_artifacts',
+          wraps=m.store.put_artifacts) as mock_put_artifacts:
+        artifact_list = m.publish_artifacts(
+            [artifact_two, published_artifact, artifact_three, artifact_two])
+
+      # New artifacts are written with one call, and each only once.
+      mock_put_artifacts.assert_called_once_with(
+          [artifact_two.artifact, artifact_three.artifact])
+      self.assertEqual([2, 1, 3, 2],
+                       [artifact.id for artifact in artifact_list])
+      self.assertEqual(2, artifact_two.id)
+      self.assertEqual(3, artifact_three.id)
+      self.assertEqual(['uri1', 'uri2', 'uri3'],
+                       [artifact.uri for artifact in m.get_all_artifacts()])
+      for artifact in m.get_all_artifacts():
+        m.check_artifact_state(artifact, ArtifactState.PUBLISHED)
+
   def testExecution(self):
     with metadata.Metadata(connection_config=self._connection_config) as m:
       context_id = m.register_run_context_if_not_exists(self._pipeline_info)
@@ -225,6 +306,24 @@ class MetadataTest(tf.test.TestCase):
             index: 0
           }""", events[1].path)
 
+  def testPublishExecutionSharedOutputArtifact(self):
+    with metadata.Metadata(connection_config=self._connection_config) as m:
+      eid = m.register_execution(
+          exec_properties={},
+          pipeline_info=self._pipeline_info,
+          component_info=self._component_info)
+      output_artifact = standard_artifacts.Examples()
+      output_dict = {'output': [output_artifact], 'alias': [output_artifact]}
+      m.publish_execution(eid, {}, output_dict)
+
+      # The artifact is stored once, with an event for each key.
+      [artifact] = m.get_all_artifacts()
+      self.assertEqual(artifact.id, output_artifact.id)
+      events = m.store.get_events_by_execution_ids([eid])
+      self.assertEqual(2, len(events))
+      self.assertEqual([output_artifact.id] * 2,
+                       [event.artifact_id for event in events])
+
   def testRegisterExecutionUpdatedExecutionType(self):
     with metadata.Metadata(connection_config=self._connection_config) as m:
       context_id = m.register_run_context_if_not_exists(self._pipeline_info)
@@ -498,25 +597,31 @@ class MetadataTest(tf.test.TestCase):
   def testGetCachedExecutionIds(self):
     with metadata.Metadata(connection_config=self._connection_config) as m:
       mock_store = mock.Mock()
-      mock_store.get_events_by_execution_ids.side_effect = [
-          [
-              metadata_store_pb2.Event(
-                  artifact_id=1, type=metadata_store_pb2.Event.INPUT)
-          ],
-          [
-              metadata_store_pb2.Event(
-                  artifact_id=1, type=metadata_store_pb2.Event.INPUT),
-              metadata_store_pb2.Event(
-                  artifact_id=2, type=metadata_store_pb2.Event.INPUT),
-              metadata_store_pb2.Event(
-                  artifact_id=3, type=metadata_store_pb2.Event.INPUT)
-          ],
-          [
-              metadata_store_pb2.Event(
-                  artifact_id=1, type=metadata_store_pb2.Event.INPUT),
-              metadata_store_pb2.Event(
-                  artifact_id=2, type=metadata_store_pb2.Event.INPUT),
-          ],
+      mock_store.get_events_by_execution_ids.return_value = [
+          metadata_store_pb2.Event(
+              execution_id=3,
+              artifact_id=1,
+              type=metadata_store_pb2.Event.INPUT),
+          metadata_store_pb2.Event(
+              execution_id=2,
+              artifact_id=1,
+              type=metadata_store_pb2.Event.INPUT),
+          metadata_store_pb2.Event(
+              execution_id=2,
+              artifact_id=2,
+              type=metadata_store_pb2.Event.INPUT),
+          metadata_store_pb2.Event(
+              execution_id=2,
+              artifact_id=3,
+              type=metadata_store_pb2.Event.INPUT),
+          metadata_store_pb2.Event(
+              execution_id=1,
+              artifact_id=1,
+              type=metadata_store_pb2.Event.INPUT),
+          metadata_store_pb2.Event(
+              execution_id=1,
+              artifact_id=2,
+              type=metadata_store_pb2.Event.INPUT),
       ]
       m._store = mock_store
 
@@ -531,6 +636,28 @@ class MetadataTest(tf.test.TestCase):
       }
 
       self.assertEqual(1, m._get_cached_execution_id(input_dict, [3, 2, 1]))
+      # Events of all candidates in a page are fetched with a single call.
+      mock_store.get_events_by_execution_ids.assert_called_once_with([3, 2, 1])
+
+  def testGetCachedExecutionIdsStopsAtFirstMatchingPage(self):
+    with metadata.Metadata(connection_config=self._connection_config) as m:
+      mock_store = mock.Mock()
+      mock_store.get_events_by_execution_ids.return_value = [
+          metadata_store_pb2.Event(
+              execution_id=2,
+              artifact_id=1,
+              type=metadata_store_pb2.Event.INPUT),
+      ]
+      m._store = mock_store
+
+      input_one = standard_artifacts.Examples()
+      input_one.id = 1
+
+      with mock.patch.object(metadata, '_CACHE_LOOKUP_PAGE_SIZE', 2):
+        self.assertEqual(
+            2, m._get_cached_execution_id({'input_one': [input_one]},
+                                          [3, 2, 1]))
+      mock_store.get_events_by_execution_ids.assert_called_once_with([3, 2])
 
   def testSearchArtifacts(self):
     with metadata.Metadata(connection_config=self._connection_config) as m:
@@ -23,7 +23,7 @@ import itertools
 
 from six import with_metaclass
 
-from typing import Any, Dict, Optional, Text, Type
+from typing import Any, Dict, Optional, Text, Tuple, Type
 
 from google.protobuf import json_format
 from google.protobuf import message
@@ -33,6 +33,41 @@ from tfx.types.node_common import _PropertyDictWrapper
 from tfx.utils import abc_utils
 from tfx.utils import json_utils
 
+# Snapshot of the (name, parameter) pairs of a ComponentSpec class's
+# PARAMETERS, INPUTS and OUTPUTS dicts, in that order.
+_SpecArgs = Tuple[Tuple[Tuple[Text, '_ComponentParameter'], ...], ...]
+
+
+# Maximum number of entries kept in _proto_json_cache.
+_PROTO_JSON_CACHE_SIZE = 1024
+# Json strings of proto execution parameters, keyed by the proto class and the
+# proto's deterministic binary serialization.
+_proto_json_cache = {}
+
+
+def _proto_to_json(proto: message.Message) -> Text:
+  """Returns the deterministic json string of a proto.
+
+  Binary serialization is much cheaper than json encoding, so the json string
+  is cached by the proto's serialized form. This saves the encoding when the
+  same spec is rebuilt, e.g. when a pipeline is reconstructed repeatedly in a
+  notebook or in tests.
+
+  Args:
+    proto: the proto to encode.
+
+  Returns:
+    The json string of the proto, with sorted keys.
+  """
+  key = (type(proto), proto.SerializeToString(deterministic=True))
+  json_string = _proto_json_cache.get(key)
+  if json_string is None:
+    json_string = json_format.MessageToJson(proto, sort_keys=True)
+    if len(_proto_json_cache) >= _PROTO_JSON_CACHE_SIZE:
+      _proto_json_cache.clear()
+    _proto_json_cache[key] = json_string
+  return json_string
+
 
 class ComponentSpec(with_metaclass(abc.ABCMeta, json_utils.Jsonable)):
   """A specification of the inputs, outputs and parameters for a component.
@@ -65,6 +100,10 @@ class ComponentSpec(with_metaclass(abc.ABCMeta, json_utils.Jsonable)):
       input_examples=input_examples_channel,
       output_examples=output_examples_channel)
 
+  PARAMETERS, INPUTS and OUTPUTS must not be modified after the class is first
+  instantiated: the class is validated once, on its first instantiation, and
+  later instances are parsed against the arguments recorded at that time.
+
   Attributes:
     PARAMETERS: a dict of string keys and ExecutionParameter values.
     INPUTS: a dict of string keys and ChannelParameter values.
@@ -83,68 +122,96 @@ class ComponentSpec(with_metaclass(abc.ABCMeta, json_utils.Jsonable)):
         of the component spec.
     """
     self._raw_args = kwargs
-    self._validate_spec()
-    self._verify_parameter_types()
-    self._parse_parameters()
+    self._parse_parameters(self._validate_spec_class())
 
   def __eq__(self, other):
     return (isinstance(other.__class__, self.__class__) and
             self.to_json_dict() == other.to_json_dict())
 
-  def _validate_spec(self):
+  @classmethod
+  def _validate_spec_class(cls) -> _SpecArgs:
+    """Validate the ComponentSpec class, once per class.
+
+    The checks only depend on the class-level PARAMETERS, INPUTS and OUTPUTS
+    dicts, so the result of a successful validation is stored on the class.
+    Failures are not stored and are raised again on every instantiation.
+    Changes made to the dicts after a successful validation are not seen.
+
+    Returns:
+      A frozen snapshot of the (name, parameter) pairs of PARAMETERS, INPUTS and
+      OUTPUTS, as a tuple of three tuples in that order.
+    """
+    # Only look at the class's own attributes, so that a subclass never picks
+    # up the validation result of its parent.
+    if '_validated_spec_args' not in cls.__dict__:
+      cls._validate_spec()
+      cls._verify_parameter_types()
+      setattr(cls, '_validated_spec_args',
+              (tuple(cls.PARAMETERS.items()), tuple(cls.INPUTS.items()),
+               tuple(cls.OUTPUTS.items())))
+    return cls.__dict__['_validated_spec_args']
+
+  @classmethod
+  def _validate_spec(cls):
     """Check the parameters and types passed to this ComponentSpec."""
-    for param_name, param in [('PARAMETERS', self.PARAMETERS),
-                              ('INPUTS', self.INPUTS),
-                              ('OUTPUTS', self.OUTPUTS)]:
+    for param_name, param in [('PARAMETERS', cls.PARAMETERS),
+                              ('INPUTS', cls.INPUTS),
+                              ('OUTPUTS', cls.OUTPUTS)]:
       if not isinstance(param, dict):
         raise TypeError(
             ('Subclass %s of ComponentSpec must override %s with a '
-             'dict; got %s instead.') % (self.__class__, param_name, param))
+             'dict; got %s instead.') % (cls, param_name, param))
 
     # Validate that the ComponentSpec class is well-formed.
     # TODO(b/128836890): Make RuntimeParameter in compliance with this check.
     seen_arg_names = set()
-    for arg_name, arg in itertools.chain(self.PARAMETERS.items(),
-                                         self.INPUTS.items(),
-                                         self.OUTPUTS.items()):
+    for arg_name, arg in itertools.chain(cls.PARAMETERS.items(),
+                                         cls.INPUTS.items(),
+                                         cls.OUTPUTS.items()):
       if not isinstance(arg, _ComponentParameter):
         raise ValueError(
             ('The ComponentSpec subclass %s expects that the values of its '
              'PARAMETERS, INPUTS, and OUTPUTS dicts are _ComponentParameter '
              'objects (i.e. ChannelParameter or ExecutionParameter objects); '
              'got %s (for argument %s) instead.') %
-            (self.__class__, arg, arg_name))
+            (cls, arg, arg_name))
       if arg_name in seen_arg_names:
         raise ValueError(
             ('The ComponentSpec subclass %s has a duplicate argument with '
              'name %s. Argument names should be unique across the PARAMETERS, '
-             'INPUTS and OUTPUTS dicts.') % (self.__class__, arg_name))
+             'INPUTS and OUTPUTS dicts.') % (cls, arg_name))
       seen_arg_names.add(arg_name)
 
-  def _verify_parameter_types(self):
+  @classmethod
+  def _verify_parameter_types(cls):
     """Verify spec parameter types."""
-    for arg in self.PARAMETERS.values():
+    for arg in cls.PARAMETERS.values():
       if not isinstance(arg, ExecutionParameter):
         raise TypeError(
             ('PARAMETERS dict expects values of type ExecutionParameter, '
              'got {}.').format(arg))
-    for arg in itertools.chain(self.INPUTS.values(), self.OUTPUTS.values()):
+    for arg in itertools.chain(cls.INPUTS.values(), cls.OUTPUTS.values()):
       if not isinstance(arg, ChannelParameter):
         raise TypeError(
             ('INPUTS and OUTPUTS dicts expect values of type ChannelParameter, '
              ' got {}.').format(arg))
 
-  def _parse_parameters(self):
-    """Parse arguments to ComponentSpec."""
+  def _parse_parameters(self, spec_args: _SpecArgs):
+    """Parse arguments to ComponentSpec.
+
+    Args:
+      spec_args: the snapshot of PARAMETERS, INPUTS and OUTPUTS of this
+        ComponentSpec class, as returned by _validate_spec_class.
+    """
+    parameter_args, input_args, output_args = spec_args
     unparsed_args = set(self._raw_args.keys())
     inputs = {}
     outputs = {}
     self.exec_properties = {}
 
     # First, check that the arguments are set.
-    for arg_name, arg in itertools.chain(self.PARAMETERS.items(),
-                                         self.INPUTS.items(),
-                                         self.OUTPUTS.items()):
+    for arg_name, arg in itertools.chain(parameter_args, input_args,
+                                         output_args):
       if arg_name not in unparsed_args:
         if arg.optional:
           continue
@@ -160,7 +227,7 @@ class ComponentSpec(with_metaclass(abc.ABCMeta, json_utils.Jsonable)):
       arg.type_check(arg_name, value)
 
     # Populate the appropriate dictionary for each parameter type.
-    for arg_name, arg in self.PARAMETERS.items():
+    for arg_name, arg in parameter_args:
       if arg.optional and arg_name not in self._raw_args:
         continue
       value = self._raw_args[arg_name]
@@ -168,14 +235,14 @@ class ComponentSpec(with_metaclass(abc.ABCMeta, json_utils.Jsonable)):
           issubclass(arg.type, message.Message) and value):
         # Create deterministic json string as it will be stored in metadata for
         # cache check.
-        value = json_format.MessageToJson(value, sort_keys=True)
+        value = _proto_to_json(value)
       self.exec_properties[arg_name] = value
-    for arg_name, arg in self.INPUTS.items():
+    for arg_name, arg in input_args:
       if arg.optional and not self._raw_args.get(arg_name):
         continue
       value = self._raw_args[arg_name]
       inputs[arg_name] = value
-    for arg_name, arg in self.OUTPUTS.items():
+    for arg_name, _ in output_args:
       value = self._raw_args[arg_name]
       outputs[arg_name] = value
 
@@ -195,6 +262,10 @@ class ComponentSpec(with_metaclass(abc.ABCMeta, json_utils.Jsonable)):
         outputs,
         compat_aliases=getattr(self, '_OUTPUT_COMPATIBILITY_ALIASES', None))
 
+  # Note: ComponentSpec instances intentionally keep a per-instance __dict__
+  # rather than declaring __slots__. The inherited Jsonable.from_json_dict
+  # restores a spec by assigning this dict to __dict__, which is how serialized
+  # components (e.g. on Kubeflow) get their spec back.
   def to_json_dict(self) -> Dict[Text, Any]:
     """Convert from an object to a JSON serializable dictionary."""
     return {
@@ -225,6 +296,11 @@ class ExecutionParameter(_ComponentParameter):
         'internal_option': ExecutionParameter(type=str),
     }
     # ...
+
+  If `type` is a protobuf message class, the value is stored in the spec's
+  exec_properties as a JSON string with sorted keys. The string is produced
+  once when the spec is created; it is what gets recorded in ML Metadata (and
+  compared for caching), and executors decode it with `json_format.Parse`.
   """
 
   def __init__(self, type=None, optional=False):  # pylint: disable=redefined-builtin
@@ -22,8 +22,11 @@ import json
 
 # Standard Imports
 
+import mock
 import tensorflow as tf
+from google.protobuf import json_format
 from tfx.proto import example_gen_pb2
+from tfx.types import component_spec
 from tfx.types.channel import Channel
 from tfx.types.component_spec import ChannelParameter
 from tfx.types.component_spec import ComponentSpec
@@ -81,6 +84,11 @@ class ComponentSpecTest(tf.test.TestCase):
                           list(s['name'] for s in decoded_proto['splits']))
     self.assertCountEqual(['pattern1', 'pattern2', 'pattern3'],
                           list(s['pattern'] for s in decoded_proto['splits']))
+    # Executors decode proto properties with json_format.Parse.
+    self.assertProtoEquals(
+        proto,
+        json_format.Parse(spec.exec_properties['proto'],
+                          example_gen_pb2.Input()))
 
     # Verify other properties.
     self.assertEqual(10, spec.exec_properties['folds'])
@@ -110,6 +118,37 @@ class ComponentSpecTest(tf.test.TestCase):
       spec = _BasicComponentSpec(
           folds=10, input=input_channel, output=Channel(type_name='WrongType'))
 
+  def testComponentspecProtoPropertyEncodingCached(self):
+    input_channel = Channel(type_name='InputType')
+    output_channel = Channel(type_name='OutputType')
+    proto = example_gen_pb2.Input(
+        splits=[example_gen_pb2.Input.Split(name='name1', pattern='pattern1')])
+
+    with mock.patch.dict(component_spec._proto_json_cache, clear=True), \
+        mock.patch.object(
+            json_format, 'MessageToJson',
+            wraps=json_format.MessageToJson) as mock_message_to_json:
+      spec_a = _BasicComponentSpec(
+          folds=10, proto=proto, input=input_channel, output=output_channel)
+      spec_b = _BasicComponentSpec(
+          folds=10,
+          proto=example_gen_pb2.Input(splits=proto.splits),
+          input=input_channel,
+          output=output_channel)
+      self.assertEqual(spec_a.exec_properties['proto'],
+                       spec_b.exec_properties['proto'])
+      # The equal proto of the second spec is served from the cache.
+      mock_message_to_json.assert_called_once()
+
+      # A modified proto is encoded again.
+      proto.splits[0].pattern = 'pattern2'
+      spec_c = _BasicComponentSpec(
+          folds=10, proto=proto, input=input_channel, output=output_channel)
+      self.assertEqual(2, mock_message_to_json.call_count)
+      self.assertEqual(
+          'pattern2',
+          json.loads(spec_c.exec_properties['proto'])['splits'][0]['pattern'])
+
   def testInvalidComponentspecMissingProperties(self):
 
     with self.assertRaisesRegexp(TypeError, "Can't instantiate abstract class"):
@@ -218,6 +257,34 @@ class ComponentSpecTest(tf.test.TestCase):
     with self.assertRaisesRegexp(ValueError, 'has a duplicate argument'):
       _ = DuplicatePropertyComponentSpec()
 
+  def testComponentspecValidatedOncePerClass(self):
+
+    class CachedComponentSpec(ComponentSpec):
+      PARAMETERS = {'x': ExecutionParameter(type=int)}
+      INPUTS = {}
+      OUTPUTS = {}
+
+    with mock.patch.object(
+        CachedComponentSpec, '_validate_spec',
+        wraps=CachedComponentSpec._validate_spec) as mock_validate_spec:
+      _ = CachedComponentSpec(x=1)
+      _ = CachedComponentSpec(x=2)
+      mock_validate_spec.assert_called_once()
+
+  def testComponentspecSubclassValidatedSeparately(self):
+
+    class ParentComponentSpec(ComponentSpec):
+      PARAMETERS = {'x': ExecutionParameter(type=int)}
+      INPUTS = {}
+      OUTPUTS = {}
+
+    class ChildComponentSpec(ParentComponentSpec):
+      INPUTS = {'x': ChannelParameter(type_name='X')}
+
+    _ = ParentComponentSpec(x=1)
+    with self.assertRaisesRegexp(ValueError, 'has a duplicate argument'):
+      _ = ChildComponentSpec(x=1)
+
   def testComponentspecMissingArguments(self):
 
     class SimpleComponentSpec(ComponentSpec):